@@ -0,0 +1,313 @@
+"""Breadth-first enumeration of the states of a subset of the cube's pieces.
+
+Only the tracked pieces are modeled, so e.g. the 88M reachable states of the
+corners fit in a bit array of a few dozen MB. Each piece is described by the
+location of its first square (see state.CORNER_FACELETS and
+state.EDGE_FACELETS), and each state of the subset by an integer rank.
+
+The visited set and the frontiers are bit arrays indexed by rank. They are
+kept in memory, or in memory-mapped files if a directory is given, in which
+case an interrupted enumeration resumes from the last completed depth.
+Frontiers are expanded in chunks, so apart from the bit arrays, memory use
+depends only on the chunk size.
+"""
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import state
+
+# Each move is a sequence of planes to rotate, as in main.recurse.
+DEFAULT_MOVES = tuple((plane,) for plane in range(len(state.ROTATIONS)))
+
+_PROGRESS_FILE = 'progress.json'
+_VISITED_FILE = 'visited.bin'
+
+
+def _location_moves(facelets: Sequence[Tuple[int, ...]],
+                    moves: Sequence[Sequence[int]]) -> np.ndarray:
+  """Where each move takes each square of the given pieces.
+
+  Squares are numbered as locations: the j-th square of piece slot i is
+  location i * len(facelets[i]) + j.
+
+  Returns:
+    Array of shape (len(moves), num_locations).
+  """
+  location_of = {f: i for i, f in enumerate(np.ravel(facelets).tolist())}
+  inverses = []
+  for p in state.rotation_permutations():
+    inverse = [0] * len(p)
+    for j, pj in enumerate(p):
+      inverse[pj] = j  # The square at pj moves to j.
+    inverses.append(inverse)
+  flat = np.ravel(facelets)
+  tables = []
+  for move in moves:
+    dest = flat.copy()
+    for plane in move:
+      dest = np.asarray(inverses[plane])[dest]
+    tables.append([location_of[f] for f in dest.tolist()])
+  return np.asarray(tables, dtype=np.int64)
+
+
+class _PieceGroup:
+  """Ranking of the locations of some of the corners, or of the edges."""
+
+  def __init__(self, facelets: Sequence[Tuple[int, ...]],
+               pieces: Sequence[int], moves: Sequence[Sequence[int]]):
+    assert len(set(pieces)) == len(pieces)
+    self.num_slots = len(facelets)
+    self.num_orientations = len(facelets[0])
+    self.pieces = tuple(pieces)
+    self.size = (math.perm(self.num_slots, len(self.pieces)) *
+                 self.num_orientations ** len(self.pieces))
+    self.moves = _location_moves(facelets, moves)
+    # For each bitmask of used slots: the d-th unused slot, and the index of
+    # each slot among the unused ones.
+    masks = np.arange(1 << self.num_slots)[:, None]
+    unused = (masks >> np.arange(self.num_slots)) & 1 == 0
+    self._index_among_unused = np.cumsum(unused, axis=1) - unused
+    self._nth_unused = np.zeros_like(self._index_among_unused)
+    rows, cols = np.nonzero(unused)
+    self._nth_unused[rows, self._index_among_unused[rows, cols]] = cols
+
+  def solved(self) -> np.ndarray:
+    return np.asarray(self.pieces, dtype=np.int64) * self.num_orientations
+
+  def rank(self, locations: np.ndarray) -> np.ndarray:
+    """Ranks an (N, len(pieces)) array of locations into [0, size)."""
+    slots, orientations = np.divmod(locations, self.num_orientations)
+    ranks = np.zeros(len(locations), dtype=np.int64)
+    used = np.zeros(len(locations), dtype=np.int64)
+    for i in range(len(self.pieces)):
+      # Index of the slot among the slots not used by earlier pieces.
+      ranks = (ranks * (self.num_slots - i) +
+               self._index_among_unused[used, slots[:, i]])
+      used |= 1 << slots[:, i]
+    for i in range(len(self.pieces)):
+      ranks = ranks * self.num_orientations + orientations[:, i]
+    return ranks
+
+  def unrank(self, ranks: np.ndarray) -> np.ndarray:
+    """Opposite of rank."""
+    n = len(self.pieces)
+    ranks = np.asarray(ranks, dtype=np.int64)
+    orientations = np.empty((len(ranks), n), dtype=np.int64)
+    for i in reversed(range(n)):
+      ranks, orientations[:, i] = np.divmod(ranks, self.num_orientations)
+    digits = np.empty((len(ranks), n), dtype=np.int64)
+    for i in reversed(range(n)):
+      ranks, digits[:, i] = np.divmod(ranks, self.num_slots - i)
+    slots = np.empty((len(ranks), n), dtype=np.int64)
+    used = np.zeros(len(ranks), dtype=np.int64)
+    for i in range(n):
+      slots[:, i] = self._nth_unused[used, digits[:, i]]
+      used |= 1 << slots[:, i]
+    return slots * self.num_orientations + orientations
+
+  def apply(self, locations: np.ndarray, move: int) -> np.ndarray:
+    return self.moves[move][locations]
+
+
+class PieceSubset:
+  """States of a subset of the corners and edges, ranked as integers.
+
+  Attributes:
+    size: Number of ranks. Not all of them need to be reachable.
+  """
+
+  def __init__(self, corners: Sequence[int] = (), edges: Sequence[int] = (),
+               moves: Sequence[Sequence[int]] = DEFAULT_MOVES):
+    """Initializer.
+
+    Args:
+      corners: Indices of the tracked corners within state.CORNER_FACELETS.
+      edges: Indices of the tracked edges within state.EDGE_FACELETS.
+      moves: Moves generating the state space. Each move is a sequence of
+        planes to rotate.
+    """
+    assert corners or edges
+    self.corners = tuple(corners)
+    self.edges = tuple(edges)
+    self.moves = tuple(tuple(move) for move in moves)
+    self.num_moves = len(moves)
+    self._corners = _PieceGroup(state.CORNER_FACELETS, corners, moves)
+    self._edges = _PieceGroup(state.EDGE_FACELETS, edges, moves)
+    self.size = self._corners.size * self._edges.size
+
+  def solved_rank(self) -> int:
+    solved = np.concatenate([self._corners.solved(), self._edges.solved()])
+    return int(self.rank(solved[None])[0])
+
+  def rank(self, locations: np.ndarray) -> np.ndarray:
+    """Ranks an (N, num_corners + num_edges) array of piece locations."""
+    n = len(self._corners.pieces)
+    return (self._corners.rank(locations[:, :n]) * self._edges.size +
+            self._edges.rank(locations[:, n:]))
+
+  def unrank(self, ranks: np.ndarray) -> np.ndarray:
+    """Opposite of rank."""
+    corner_ranks, edge_ranks = np.divmod(ranks, self._edges.size)
+    return np.concatenate([self._corners.unrank(corner_ranks),
+                           self._edges.unrank(edge_ranks)], axis=1)
+
+  def apply(self, locations: np.ndarray, move: int) -> np.ndarray:
+    """Piece locations after applying a move."""
+    n = len(self._corners.pieces)
+    return np.concatenate([self._corners.apply(locations[:, :n], move),
+                           self._edges.apply(locations[:, n:], move)], axis=1)
+
+  def neighbors(self, ranks: np.ndarray, move: int) -> np.ndarray:
+    """Ranks of the states reached by applying a move to the given states."""
+    return self.rank(self.apply(self.unrank(ranks), move))
+
+
+def _bits(directory: Optional[str], name: str, num_bytes: int,
+          create: bool) -> np.ndarray:
+  """A zeroed (if create) or existing bit array, in memory or on disk."""
+  if directory is None:
+    return np.zeros(num_bytes, dtype=np.uint8)
+  path = os.path.join(directory, name)
+  return np.memmap(path, dtype=np.uint8, mode='w+' if create else 'r+',
+                   shape=(num_bytes,))
+
+
+def _frontier_file(depth: int) -> str:
+  return f'frontier_{depth}.bin'
+
+
+def _ranks_in(bits: np.ndarray, start: int, stop: int) -> np.ndarray:
+  """Ranks whose bits are set within bytes [start, stop)."""
+  unpacked = np.unpackbits(np.asarray(bits[start:stop]), bitorder='little')
+  return np.flatnonzero(unpacked).astype(np.int64) + 8 * start
+
+
+def _popcount(bits: np.ndarray, chunk_bytes: int) -> int:
+  return sum(
+      int(np.unpackbits(np.asarray(bits[i:i + chunk_bytes])).sum())
+      for i in range(0, len(bits), chunk_bytes))
+
+
+def _config(subset: PieceSubset) -> Dict[str, Any]:
+  """Identifies the enumeration stored in a directory."""
+  return {'corners': list(subset.corners), 'edges': list(subset.edges),
+          'moves': [list(move) for move in subset.moves], 'size': subset.size}
+
+
+def _write_progress(directory: str, subset: PieceSubset,
+                    counts: List[int]) -> None:
+  path = os.path.join(directory, _PROGRESS_FILE)
+  with open(path + '.tmp', 'w') as f:
+    json.dump({'config': _config(subset), 'counts': counts}, f)
+  os.replace(path + '.tmp', path)
+
+
+def _read_progress(directory: str, subset: PieceSubset) -> List[int]:
+  """Counts saved in directory, or [] if there are none."""
+  path = os.path.join(directory, _PROGRESS_FILE)
+  if not os.path.exists(path):
+    return []
+  with open(path) as f:
+    progress = json.load(f)
+  if progress.get('config') != _config(subset):
+    raise ValueError(
+        f'{directory} holds an enumeration of {progress.get("config")}, '
+        f'not of {_config(subset)}')
+  counts = progress['counts']
+  # Clean up frontiers left by an interruption right after saving progress.
+  for depth in range(len(counts) - 1):
+    stale = os.path.join(directory, _frontier_file(depth))
+    if os.path.exists(stale):
+      os.remove(stale)
+  return counts
+
+
+def enumerate_bfs(subset: PieceSubset, directory: Optional[str] = None,
+                  chunk_bytes: int = 1 << 14,
+                  max_depth: Optional[int] = None) -> List[int]:
+  """Counts the states of a piece subset at each distance from solved.
+
+  Args:
+    subset: The pieces and moves to enumerate.
+    directory: If given, bit arrays are memory-mapped files in this directory,
+      and an enumeration previously interrupted in it is resumed.
+    chunk_bytes: Number of frontier bytes expanded at once. A chunk holds up to
+      8 * chunk_bytes states, and expanding it takes a few int64 arrays of
+      shape (8 * chunk_bytes, num_pieces), i.e. about
+      200 * chunk_bytes * num_pieces bytes. The default needs a few dozen MB.
+    max_depth: If given, stop after this depth.
+
+  Raises:
+    ValueError: If directory holds an enumeration of another subset.
+
+  Returns:
+    A list whose d-th entry is the number of states at distance d.
+  """
+  num_bytes = (subset.size + 7) // 8
+  counts = []
+  if directory is not None:
+    os.makedirs(directory, exist_ok=True)
+    counts = _read_progress(directory, subset)
+
+  if counts:
+    visited = _bits(directory, _VISITED_FILE, num_bytes, create=False)
+    frontier = _bits(directory, _frontier_file(len(counts) - 1), num_bytes,
+                     create=False)
+  else:
+    visited = _bits(directory, _VISITED_FILE, num_bytes, create=True)
+    frontier = _bits(directory, _frontier_file(0), num_bytes, create=True)
+    solved = subset.solved_rank()
+    visited[solved // 8] = frontier[solved // 8] = 1 << (solved % 8)
+    counts = [1]
+    if directory is not None:
+      visited.flush()
+      frontier.flush()
+      _write_progress(directory, subset, counts)
+
+  while counts[-1] and (max_depth is None or len(counts) <= max_depth):
+    depth = len(counts)
+    next_name = _frontier_file(depth)
+    if directory is not None and os.path.exists(
+        os.path.join(directory, next_name)):
+      # Interrupted after the next frontier was complete.
+      next_frontier = _bits(directory, next_name, num_bytes, create=False)
+    else:
+      tmp_name = next_name + '.tmp'
+      next_frontier = _bits(directory, tmp_name, num_bytes, create=True)
+      for start in range(0, num_bytes, chunk_bytes):
+        locations = subset.unrank(_ranks_in(frontier, start,
+                                            start + chunk_bytes))
+        for move in range(subset.num_moves):
+          neighbors = subset.rank(subset.apply(locations, move))
+          np.bitwise_or.at(next_frontier, neighbors // 8,
+                           (1 << (neighbors % 8)).astype(np.uint8))
+      for start in range(0, num_bytes, chunk_bytes):
+        stop = start + chunk_bytes
+        next_frontier[start:stop] &= ~visited[start:stop]
+      if directory is not None:
+        next_frontier.flush()
+        del next_frontier
+        os.replace(os.path.join(directory, tmp_name),
+                   os.path.join(directory, next_name))
+        next_frontier = _bits(directory, next_name, num_bytes, create=False)
+
+    # Idempotent, so safe to redo after an interruption.
+    for start in range(0, num_bytes, chunk_bytes):
+      stop = start + chunk_bytes
+      visited[start:stop] |= next_frontier[start:stop]
+    counts.append(_popcount(next_frontier, chunk_bytes))
+    frontier = next_frontier
+    if directory is not None:
+      visited.flush()
+      _write_progress(directory, subset, counts)
+      os.remove(os.path.join(directory, _frontier_file(depth - 1)))
+
+  if not counts[-1]:
+    del counts[-1]
+  if max_depth is not None:
+    del counts[max_depth + 1:]
+  return counts
@@ -0,0 +1,126 @@
+import itertools
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import numpy as np
+
+import bfs
+import state
+
+
+def _sticker_locations(path, corners, edges):
+  """Locations of the first square of each piece, by rotating a State."""
+  cube = state.labeled_cube()
+  for plane in path:
+    cube.rotate(plane)
+  encoded = cube.encode()
+  result = []
+  for facelets, pieces in ((state.CORNER_FACELETS, corners),
+                           (state.EDGE_FACELETS, edges)):
+    flat = [f for piece in facelets for f in piece]
+    result.extend(flat.index(encoded.index(facelets[i][0])) for i in pieces)
+  return tuple(result)
+
+
+class BfsTest(unittest.TestCase):
+
+  def test_rank_unrank(self):
+    subset = bfs.PieceSubset(corners=(1, 4, 6), edges=(0, 7))
+    ranks = np.arange(0, subset.size, 997)
+    np.testing.assert_array_equal(ranks, subset.rank(subset.unrank(ranks)))
+    locations = subset.unrank(ranks)
+    self.assertTrue(np.all(locations[:, :3] < 24))
+    self.assertTrue(np.all(locations[:, 3:] < 24))
+
+  def test_neighbors_match_rotate(self):
+    corners, edges = (0, 5), (3, 8, 11)
+    subset = bfs.PieceSubset(corners, edges)
+    for path in itertools.product(range(6), repeat=3):
+      rank = subset.solved_rank()
+      for plane in path:
+        rank = subset.neighbors(np.array([rank]), plane)[0]
+      expected = subset.rank(
+          np.array([_sticker_locations(path, corners, edges)]))[0]
+      self.assertEqual(expected, rank, path)
+
+  def test_distances_match_exhaustive_search(self):
+    corners, edges = (2,), (4, 9)
+    distances = {}
+    for length in range(5):
+      for path in itertools.product(range(6), repeat=length):
+        distances.setdefault(_sticker_locations(path, corners, edges), length)
+    expected = [list(distances.values()).count(d) for d in range(5)]
+    counts = bfs.enumerate_bfs(bfs.PieceSubset(corners, edges), max_depth=4)
+    self.assertEqual(expected, counts)
+
+  def test_all_states_reached(self):
+    subset = bfs.PieceSubset(corners=(0, 3))
+    counts = bfs.enumerate_bfs(subset, chunk_bytes=3)
+    self.assertEqual(subset.size, sum(counts))
+    self.assertNotEqual(0, counts[-1])
+
+  def test_resume(self):
+    subset = bfs.PieceSubset(edges=(0, 1, 2))
+    expected = bfs.enumerate_bfs(subset)
+    with tempfile.TemporaryDirectory() as directory:
+      partial = bfs.enumerate_bfs(subset, directory, max_depth=3)
+      self.assertEqual(expected[:4], partial)
+      self.assertTrue(os.path.exists(os.path.join(directory, 'visited.bin')))
+      self.assertEqual(expected, bfs.enumerate_bfs(subset, directory))
+
+  def test_resume_other_subset(self):
+    with tempfile.TemporaryDirectory() as directory:
+      bfs.enumerate_bfs(bfs.PieceSubset(corners=(0, 3)), directory,
+                        max_depth=2)
+      with self.assertRaises(ValueError):
+        bfs.enumerate_bfs(bfs.PieceSubset(edges=(0, 1)), directory)
+      with self.assertRaises(ValueError):
+        bfs.enumerate_bfs(
+            bfs.PieceSubset(corners=(0, 3), moves=((0,), (1,))), directory)
+
+  def test_resume_respects_max_depth(self):
+    subset = bfs.PieceSubset(corners=(0, 3))
+    expected = bfs.enumerate_bfs(subset)
+    with tempfile.TemporaryDirectory() as directory:
+      self.assertEqual(expected, bfs.enumerate_bfs(subset, directory))
+      self.assertEqual(expected[:3],
+                       bfs.enumerate_bfs(subset, directory, max_depth=2))
+
+  def test_resume_removes_stale_frontiers(self):
+    subset = bfs.PieceSubset(edges=(0, 1))
+    with tempfile.TemporaryDirectory() as directory:
+      bfs.enumerate_bfs(subset, directory, max_depth=3)
+      # As if interrupted right after saving the progress of depth 3.
+      stale = os.path.join(directory, 'frontier_2.bin')
+      with open(stale, 'wb') as f:
+        f.write(b'\0' * ((subset.size + 7) // 8))
+      with open(os.path.join(directory, 'progress.json')) as f:
+        self.assertEqual(4, len(json.load(f)['counts']))
+      self.assertEqual(bfs.enumerate_bfs(subset),
+                       bfs.enumerate_bfs(subset, directory))
+      self.assertFalse(os.path.exists(stale))
+
+  def test_memory_bounded_by_chunk(self):
+    subset = bfs.PieceSubset(edges=(0, 1, 2))
+    chunk_bytes = 16
+
+    def peak_memory(chunk_bytes):
+      with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        try:
+          bfs.enumerate_bfs(subset, directory, chunk_bytes=chunk_bytes)
+          return tracemalloc.get_traced_memory()[1]
+        finally:
+          tracemalloc.stop()
+
+    # Largest frontiers hold thousands of states, but a chunk only 128.
+    peak = peak_memory(chunk_bytes)
+    self.assertLess(peak, 200 * chunk_bytes * 3 + (128 << 10))
+    self.assertLess(2 * peak, peak_memory(subset.size))
+
+
+if __name__ == '__main__':
+  unittest.main()
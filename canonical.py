@@ -0,0 +1,290 @@
+"""Finite automaton accepting only canonical move sequences of main.recurse.
+
+main.recurse makes two kinds of moves, each costing one unit of depth:
+* Move p < NUM_PLANES rotates plane p once.
+* Move NUM_PLANES + p rotates plane p twice more. It is only available right
+  after rotating plane p, once the path has more than one rotation and the
+  rotation before the last was of another plane.
+
+The moves available after a path depend only on its context: its last plane,
+and whether the two-rotation move is available. A sequence of moves is
+redundant if an earlier sequence, in order of cost and then lexicographically,
+can replace it wherever it occurs (see _Enumeration.is_redundant). Replacing
+part of a path in this way keeps it valid, reaches the same states and makes
+it earlier, so pruning sequences with a redundant suffix does not change the
+states reachable within a given depth.
+
+The automaton remembers the last few moves and rejects a move if it makes any
+suffix of them redundant. It is minimized, so a search carries a single
+integer automaton state and consults a bitmask of allowed moves at every node.
+"""
+import dataclasses
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import state
+
+# Transition target for moves which are not allowed.
+DEAD = -1
+# Automaton state corresponding to the empty sequence.
+START = 0
+NUM_PLANES = len(state.ROTATIONS)
+NUM_MOVES = 2 * NUM_PLANES
+
+# (last plane or None, whether the two-rotation move is available).
+Context = Tuple[Optional[int], bool]
+_EMPTY_CONTEXT: Context = (None, False)
+
+
+def move_planes(move: int) -> Tuple[int, ...]:
+  """Planes rotated by a move."""
+  if move < NUM_PLANES:
+    return (move,)
+  return (move - NUM_PLANES,) * 2
+
+
+def path_moves(moves: Sequence[int]) -> List[int]:
+  """Planes rotated by a sequence of moves, as in main.recurse's path."""
+  return [plane for move in moves for plane in move_planes(move)]
+
+
+def path_context(path: Sequence[int]) -> Context:
+  """Context after a path of planes, as built by main.recurse."""
+  if not path:
+    return _EMPTY_CONTEXT
+  return path[-1], len(path) > 1 and path[-1] != path[-2]
+
+
+def _is_valid(context: Context, move: int) -> bool:
+  """Whether main.recurse may make the move in the given context."""
+  if move < NUM_PLANES:
+    return True
+  last, available = context
+  return available and last == move - NUM_PLANES
+
+
+def _after(context: Context, move: int) -> Context:
+  """Context after making the move in the given context."""
+  last, _ = context
+  if move < NUM_PLANES:
+    return move, last is not None and last != move
+  return move - NUM_PLANES, False
+
+
+@dataclasses.dataclass(frozen=True)
+class MoveAutomaton:
+  """Minimized DFA over moves.
+
+  Attributes:
+    transitions: transitions[s][move] is the state reached from state s after
+      the given move, or DEAD if the move is not allowed.
+    allowed: allowed[s] is a bitmask whose bit i is set iff move i may be
+      made from state s.
+    entries: entries[2 * plane + available] is the state from which to extend
+      a path whose context is (plane, available). See resume.
+  """
+  transitions: Tuple[Tuple[int, ...], ...]
+  allowed: Tuple[int, ...]
+  entries: Tuple[int, ...]
+
+  @property
+  def num_states(self) -> int:
+    return len(self.transitions)
+
+  def step(self, automaton_state: int, move: int) -> int:
+    """State after the given move, or DEAD."""
+    if automaton_state == DEAD:
+      return DEAD
+    return self.transitions[automaton_state][move]
+
+  def run(self, moves: Sequence[int], automaton_state: int = START) -> int:
+    """State after all the given moves, or DEAD."""
+    for move in moves:
+      automaton_state = self.step(automaton_state, move)
+    return automaton_state
+
+  def accepts(self, moves: Sequence[int]) -> bool:
+    return self.run(moves) != DEAD
+
+  def resume(self, path: Sequence[int]) -> int:
+    """State from which to extend a path of planes, as in main.recurse.
+
+    Only sequences of moves made after the path are pruned. Sequences which
+    overlap the path are kept, since replacing them would change the path
+    itself. The state depends only on the context of the path, so it does not
+    matter how the path was split into moves.
+    """
+    if not path:
+      return START
+    last, available = path_context(path)
+    return self.entries[2 * last + available]
+
+
+class _Enumeration:
+  """All sequences of cost at most max_length reaching a new node.
+
+  A node is a state together with a context.
+  """
+
+  def __init__(self, max_length: int):
+    self._perms = state.rotation_permutations()
+    self._encodings: Dict[Tuple[int, ...], Tuple[int, ...]] = {
+        (): state.State.solved().encode()}
+    solved = self._encodings[()]
+    # First sequence reaching each node.
+    self.first: Dict[Tuple[Tuple[int, ...], Context], Tuple[int, ...]] = {
+        (solved, _EMPTY_CONTEXT): ()}
+    # Lowest cost of a sequence reaching each state.
+    self.cost: Dict[Tuple[int, ...], int] = {solved: 0}
+    level = [((), _EMPTY_CONTEXT)]
+    for length in range(1, max_length + 1):
+      next_level = []
+      for seq, context in level:
+        for move in range(NUM_MOVES):
+          if not _is_valid(context, move):
+            continue
+          extended = seq + (move,)
+          encoded = self.encode(extended)
+          self.cost.setdefault(encoded, length)
+          key = (encoded, _after(context, move))
+          if key in self.first:
+            continue
+          self.first[key] = extended
+          next_level.append((extended, key[1]))
+      level = next_level
+
+  def encode(self, moves: Tuple[int, ...]) -> Tuple[int, ...]:
+    """State reached from solved by the given moves."""
+    encoded = self._encodings.get(moves)
+    if encoded is None:
+      encoded = self.encode(moves[:-1])
+      for plane in move_planes(moves[-1]):
+        encoded = tuple(encoded[i] for i in self._perms[plane])
+      self._encodings[moves] = encoded
+    return encoded
+
+  def is_redundant(self, moves: Tuple[int, ...]) -> bool:
+    """Whether an earlier sequence can replace the moves wherever they occur.
+
+    A sequence r which is valid from the solved cube is valid after any path.
+    It can replace the moves if it reaches the same state and either:
+    * r is earlier, has the same last plane, and the two-rotation move is
+      available after r whenever it is available after the moves. Any
+      continuation of the moves can then continue r.
+    * r costs at least 2 less. Continuing r as the moves are continued, but
+      with a two-rotation move not available after r made as two single
+      rotations, costs at most 1 more and ends in the same context.
+
+    The context after a sequence with a single rotation depends on what
+    precedes it, and is taken as if nothing did. This underestimates when the
+    two-rotation move is available after r, and a single rotation is never
+    redundant, so the test is conservative.
+
+    Args:
+      moves: Moves starting with a single rotation.
+    """
+    encoded = self.encode(moves)
+    if self.cost.get(encoded, len(moves)) <= len(moves) - 2:
+      return True
+    last, available = path_context(path_moves(moves))
+    for flag in (True, False) if not available else (True,):
+      first = self.first.get((encoded, (last, flag)))
+      if first is not None and (len(first), first) < (len(moves), moves):
+        return True
+    return False
+
+  def has_redundant_suffix(self, moves: Tuple[int, ...]) -> bool:
+    """Whether any suffix of the moves starting with a rotation is redundant."""
+    return any(self.is_redundant(moves[i:])
+               for i in range(len(moves)) if moves[i] < NUM_PLANES)
+
+
+def canonical_sequences(max_length: int) -> List[Tuple[int, ...]]:
+  """All sequences of moves of cost at most max_length with no redundancy.
+
+  Sequences are listed by cost and then lexicographically.
+  """
+  enumeration = _Enumeration(max_length)
+  sequences = [()]
+  level = [((), _EMPTY_CONTEXT)]
+  for _ in range(max_length):
+    next_level = []
+    for seq, context in level:
+      for move in range(NUM_MOVES):
+        extended = seq + (move,)
+        if (_is_valid(context, move) and
+            not enumeration.has_redundant_suffix(extended)):
+          next_level.append((extended, _after(context, move)))
+    sequences.extend(seq for seq, _ in next_level)
+    level = next_level
+  return sequences
+
+
+def _minimize(
+    transitions: List[List[int]]) -> Tuple[List[List[int]], List[int]]:
+  """Moore partition refinement. State START is kept as state 0.
+
+  Returns:
+    (minimized, block): The minimized transitions, and the minimized state of
+    each original state.
+  """
+  block = [0] * len(transitions)
+  num_blocks = 1
+  while True:
+    signatures: Dict[Tuple[int, ...], int] = {}
+    new_block = []
+    for s, row in enumerate(transitions):
+      signature = (block[s],) + tuple(
+          DEAD if t == DEAD else block[t] for t in row)
+      new_block.append(signatures.setdefault(signature, len(signatures)))
+    block = new_block
+    if len(signatures) == num_blocks:
+      break
+    num_blocks = len(signatures)
+
+  # Blocks are numbered in order of first appearance, so START maps to 0.
+  minimized = [None] * num_blocks
+  for s, row in enumerate(transitions):
+    if minimized[block[s]] is None:
+      minimized[block[s]] = [DEAD if t == DEAD else block[t] for t in row]
+  return minimized, block
+
+
+def build(max_length: int = 5) -> MoveAutomaton:
+  """Builds an automaton rejecting redundant sequences up to max_length.
+
+  A sequence is accepted iff it is valid, and none of its suffixes of cost at
+  most max_length which start with a single rotation is redundant. Longer
+  identities are not detected.
+  """
+  assert max_length >= 2
+  enumeration = _Enumeration(max_length)
+  # Each automaton state is (context, window of the last max_length - 1 moves
+  # made since the search started). The first states are START and the
+  # entries, which start from the context of an existing path.
+  contexts = [_EMPTY_CONTEXT] + [(plane, available)
+                                 for plane in range(NUM_PLANES)
+                                 for available in (False, True)]
+  automaton_states = [(context, ()) for context in contexts]
+  index = {s: i for i, s in enumerate(automaton_states)}
+  transitions = []
+  for context, window in automaton_states:  # Grows while iterating.
+    row = []
+    for move in range(NUM_MOVES):
+      extended = window + (move,)
+      if (not _is_valid(context, move) or
+          enumeration.has_redundant_suffix(extended)):
+        row.append(DEAD)
+        continue
+      next_state = (_after(context, move), extended[-(max_length - 1):])
+      if next_state not in index:
+        index[next_state] = len(automaton_states)
+        automaton_states.append(next_state)
+      row.append(index[next_state])
+    transitions.append(row)
+
+  minimized, block = _minimize(transitions)
+  return MoveAutomaton(
+    transitions=tuple(tuple(row) for row in minimized),
+    allowed=tuple(sum(1 << move for move, t in enumerate(row) if t != DEAD)
+                  for row in minimized),
+    entries=tuple(block[i] for i in range(1, len(contexts))))
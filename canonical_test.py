@@ -0,0 +1,90 @@
+import itertools
+import unittest
+
+import canonical
+import state
+
+U, D, F = (state.ROTATIONS.index(plane) for plane in 'UDF')
+UU = canonical.NUM_PLANES + U
+
+
+def _states(seqs):
+  """States reached by the sequences, by their cost."""
+  states = {}
+  for seq in seqs:
+    cube = state.State.solved()
+    for plane in canonical.path_moves(seq):
+      cube.rotate(plane)
+    states.setdefault(cube.encode(), len(seq))
+  return states
+
+
+def _valid_sequences(max_length, context=canonical.path_context([])):
+  for n in range(max_length + 1):
+    for seq in itertools.product(range(canonical.NUM_MOVES), repeat=n):
+      c = context
+      for move in seq:
+        if not canonical._is_valid(c, move):
+          break
+        c = canonical._after(c, move)
+      else:
+        yield seq
+
+
+class CanonicalTest(unittest.TestCase):
+
+  def test_canonical_sequences_reach_all_states(self):
+    self.assertDictEqual(_states(_valid_sequences(4)),
+                         _states(canonical.canonical_sequences(4)))
+
+  def test_rejects_redundant_sequences(self):
+    automaton = canonical.build(4)
+    # UUUU is the identity.
+    self.assertFalse(automaton.accepts([U, U, U, U]))
+    # The two-rotation move needs a rotation of another plane before the last.
+    self.assertFalse(automaton.accepts([U, UU]))
+    self.assertFalse(automaton.accepts([U, U, UU]))
+    # DUUU costs 3, so it is kept although UUUD reaches the same state.
+    self.assertTrue(automaton.accepts([D, U, UU]))
+    self.assertTrue(automaton.accepts([U, U, U, D]))
+    # DU ends with another plane than UD, but DUF ends as UDF does.
+    self.assertTrue(automaton.accepts([D, U]))
+    self.assertTrue(automaton.accepts([U, D, F]))
+    self.assertFalse(automaton.accepts([D, U, F]))
+    self.assertFalse(automaton.accepts([D, D, U, U, U, U, D]))
+
+  def test_accepts_exactly_canonical_sequences(self):
+    max_length = 4
+    automaton = canonical.build(max_length)
+    canonical_set = set(canonical.canonical_sequences(max_length))
+    for seq in _valid_sequences(max_length):
+      self.assertEqual(automaton.accepts(seq), seq in canonical_set, seq)
+
+  def test_allowed_mask_matches_transitions(self):
+    automaton = canonical.build(5)
+    for s in range(automaton.num_states):
+      for move in range(canonical.NUM_MOVES):
+        self.assertEqual(bool((automaton.allowed[s] >> move) & 1),
+                         automaton.step(s, move) != canonical.DEAD)
+
+  def test_resume_prunes_only_new_moves(self):
+    max_length = 4
+    automaton = canonical.build(max_length)
+    enumeration = canonical._Enumeration(max_length)
+    self.assertEqual(canonical.START, automaton.resume([]))
+    for path in ([F], [U, U, U, U, F], [D, U, U], [F, U, U, U]):
+      context = canonical.path_context(path)
+      for seq in _valid_sequences(3, context):
+        self.assertEqual(
+            not enumeration.has_redundant_suffix(seq),
+            automaton.run(seq, automaton.resume(path)) != canonical.DEAD,
+            (path, seq))
+
+  def test_minimized(self):
+    automaton = canonical.build(4)
+    self.assertLess(automaton.num_states,
+                    len(canonical.canonical_sequences(3)))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,200 @@
+"""Heuristics estimating how far a State is from being solved.
+
+Every heuristic can evaluate a single State, and can evaluate a batch of
+encoded states (see State.encode) given as an (N, 54) integer array. This lets
+the solver switch heuristics without changing the search code.
+"""
+import abc
+from typing import Dict, Iterable, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+import state
+
+_SOLVED_ENCODED = np.asarray(state.State.solved().encode())
+
+
+def encode_batch(states: Iterable[state.State]) -> np.ndarray:
+  """Encodes a sequence of states into an (N, 54) array."""
+  return np.array([s.encode() for s in states], dtype=np.int64).reshape(-1, 54)
+
+
+class Heuristic(abc.ABC):
+  """Estimated cost of solving a cube. Lower is better; solved cubes cost 0."""
+
+  @abc.abstractmethod
+  def __call__(self, cube: state.State) -> float:
+    """Cost of a single state."""
+
+  @abc.abstractmethod
+  def batch(self, encoded: np.ndarray) -> np.ndarray:
+    """Costs of an (N, 54) array of encoded states, as an (N,) array."""
+
+
+class NaiveCost(Heuristic):
+  """Number of squares with the wrong color. See State.naive_cost."""
+
+  def __call__(self, cube: state.State) -> int:
+    return cube.naive_cost()
+
+  def batch(self, encoded: np.ndarray) -> np.ndarray:
+    return np.count_nonzero(encoded != _SOLVED_ENCODED, axis=1)
+
+
+class CubeCost(Heuristic):
+  """Number of cubes in the wrong location. See State.cube_cost."""
+
+  def __init__(self):
+    self._corner_facelets = np.asarray(state.CORNER_FACELETS)
+    self._corner_scores = np.asarray(state.CORNER_SCORES)
+    self._edge_facelets = np.asarray(state.EDGE_FACELETS)
+    self._edge_scores = np.asarray(state.EDGE_SCORES)
+
+  def __call__(self, cube: state.State) -> int:
+    return cube.cube_cost()
+
+  def batch(self, encoded: np.ndarray) -> np.ndarray:
+    # (N, 8, 3) colors of each corner, and (N, 12, 2) colors of each edge.
+    corners = encoded[:, self._corner_facelets]
+    edges = encoded[:, self._edge_facelets]
+    corner_idx = 36 * corners[..., 0] + 6 * corners[..., 1] + corners[..., 2]
+    edge_idx = 6 * edges[..., 0] + edges[..., 1]
+    score = (
+        self._corner_scores[np.arange(len(state.CORNER_FACELETS)),
+                            corner_idx].sum(axis=1) +
+        self._edge_scores[np.arange(len(state.EDGE_FACELETS)),
+                          edge_idx].sum(axis=1))
+    return state.MAX_CUBE_COST - score
+
+
+class PatternDatabase(Heuristic):
+  """Lookup table of costs keyed by the colors of a subset of squares.
+
+  Attributes:
+    facelets: Indices within State.encode() of the squares forming the key.
+    default: Cost of states whose key is not in the table.
+  """
+
+  def __init__(self, facelets: Sequence[int], costs: Mapping[int, float],
+               default: float = 0):
+    """Initializer.
+
+    Args:
+      facelets: Indices within State.encode() of the squares forming the key.
+      costs: Map from key to cost. The key of a state is the base-6 number
+        whose digits are the colors of the given squares, most significant
+        first (see PatternDatabase.key).
+      default: Cost of states whose key is not in costs.
+    """
+    assert len(facelets) <= 24  # Keys must fit in an int64.
+    self.facelets = tuple(facelets)
+    self.default = default
+    self._costs: Dict[int, float] = dict(costs)
+    self._weights = 6 ** np.arange(len(self.facelets) - 1, -1, -1,
+                                   dtype=np.int64)
+    self._sorted_keys = np.array(sorted(self._costs), dtype=np.int64)
+    self._sorted_costs = np.array(
+        [self._costs[k] for k in self._sorted_keys.tolist()])
+
+  def save(self, path: str) -> None:
+    """Saves the table as an .npz file, to be loaded by PatternDatabase.load."""
+    np.savez(path, facelets=np.asarray(self.facelets), keys=self._sorted_keys,
+             costs=self._sorted_costs, default=self.default)
+
+  @staticmethod
+  def load(path: str) -> 'PatternDatabase':
+    with np.load(path) as data:
+      return PatternDatabase(
+          data['facelets'].tolist(),
+          dict(zip(data['keys'].tolist(), data['costs'].tolist())),
+          data['default'].item())
+
+  def key(self, encoded: Sequence[int]) -> int:
+    k = 0
+    for i in self.facelets:
+      k = 6 * k + encoded[i]
+    return k
+
+  def __call__(self, cube: state.State) -> float:
+    return self._costs.get(self.key(cube.encode()), self.default)
+
+  def batch(self, encoded: np.ndarray) -> np.ndarray:
+    keys = encoded[:, self.facelets] @ self._weights
+    if not len(self._sorted_keys):
+      return np.full(len(keys), self.default)
+    idx = np.searchsorted(self._sorted_keys, keys)
+    idx = np.minimum(idx, len(self._sorted_keys) - 1)
+    found = self._sorted_keys[idx] == keys
+    return np.where(found, self._sorted_costs[idx], self.default)
+
+
+class Weighted(Heuristic):
+  """Weighted sum of other heuristics."""
+
+  def __init__(self, terms: Sequence[Tuple[float, Heuristic]]):
+    assert terms
+    self.terms = tuple(terms)
+
+  def __call__(self, cube: state.State) -> float:
+    return sum(weight * h(cube) for weight, h in self.terms)
+
+  def batch(self, encoded: np.ndarray) -> np.ndarray:
+    return sum(weight * h.batch(encoded) for weight, h in self.terms)
+
+
+HEURISTICS: Dict[str, Heuristic] = {
+  'naive': NaiveCost(),
+  'cube': CubeCost(),
+}
+
+_PATTERN_DATABASE_PREFIX = 'pdb:'
+
+
+def register(name: str, heuristic: Heuristic) -> None:
+  """Makes a heuristic selectable by name (see get)."""
+  if name in HEURISTICS:
+    raise ValueError(f'Heuristic {name} is already registered')
+  if '+' in name or '*' in name or name.startswith(_PATTERN_DATABASE_PREFIX):
+    raise ValueError(f'Invalid heuristic name {name}')
+  HEURISTICS[name] = heuristic
+
+
+def _get_term(name: str) -> Heuristic:
+  if name.startswith(_PATTERN_DATABASE_PREFIX):
+    path = name[len(_PATTERN_DATABASE_PREFIX):]
+    try:
+      return PatternDatabase.load(path)
+    except (OSError, KeyError) as e:
+      raise ValueError(f'Cannot load pattern database {path}: {e}') from e
+  if name not in HEURISTICS:
+    raise ValueError(f'Unknown heuristic {name}; choose from '
+                     f'{", ".join(sorted(HEURISTICS))}')
+  return HEURISTICS[name]
+
+
+def get(spec: Union[str, Heuristic]) -> Heuristic:
+  """Heuristic given by a spec, e.g. selected on the command line.
+
+  Args:
+    spec: A Heuristic, which is returned as is, or a string. A string is a sum
+      of terms separated by '+', each of which is a name optionally preceded
+      by a weight and '*', as in '2*cube+naive'. A name is a key of
+      HEURISTICS, or 'pdb:' followed by the path of a PatternDatabase saved
+      by PatternDatabase.save.
+
+  Raises:
+    ValueError: If the spec is invalid.
+  """
+  if isinstance(spec, Heuristic):
+    return spec
+  terms = []
+  for term in spec.split('+'):
+    weight, _, name = term.strip().rpartition('*')
+    try:
+      weight = float(weight) if weight else 1.
+    except ValueError:
+      raise ValueError(f'Invalid weight in {term}') from None
+    terms.append((weight, _get_term(name.strip())))
+  if len(terms) == 1 and terms[0][0] == 1:
+    return terms[0][1]
+  return Weighted(terms)
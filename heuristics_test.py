@@ -0,0 +1,108 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import heuristics
+import state
+
+
+def _random_states(n, seed=0):
+  rng = random.Random(seed)
+  cube = state.State.solved()
+  states = []
+  for _ in range(n):
+    cube.rotate(rng.randrange(6))
+    states.append(state.State.decode(cube.encode()))
+  return states
+
+
+class HeuristicsTest(unittest.TestCase):
+
+  def test_solved_costs_zero(self):
+    solved = state.State.solved()
+    encoded = heuristics.encode_batch([solved])
+    for name, h in heuristics.HEURISTICS.items():
+      self.assertEqual(0, h(solved), name)
+      np.testing.assert_array_equal([0], h.batch(encoded))
+
+  def test_batch_matches_scalar(self):
+    states = _random_states(200)
+    encoded = heuristics.encode_batch(states)
+    for name, h in heuristics.HEURISTICS.items():
+      np.testing.assert_array_equal(
+          [h(s) for s in states], h.batch(encoded), err_msg=name)
+
+  def test_cube_cost(self):
+    s = state.State(
+        front='OORYWRRGY',
+        back='WBRRYWWOW',
+        up='YOOGRYYWB',
+        down='WOOWOGBYR',
+        left='GWGRBBOBB',
+        right='YRGBGGBYG')
+    h = heuristics.CubeCost()
+    self.assertEqual(40, h(s))
+    np.testing.assert_array_equal([40], h.batch(heuristics.encode_batch([s])))
+
+  def test_pattern_database(self):
+    states = _random_states(50)
+    facelets = state.CORNER_FACELETS[0] + state.EDGE_FACELETS[0]
+    db = heuristics.PatternDatabase(facelets, {}, default=-1)
+    costs = {db.key(s.encode()): i for i, s in enumerate(states[:20])}
+    db = heuristics.PatternDatabase(facelets, costs, default=-1)
+    expected = [costs.get(db.key(s.encode()), -1) for s in states]
+    self.assertEqual(expected, [db(s) for s in states])
+    np.testing.assert_array_equal(
+        expected, db.batch(heuristics.encode_batch(states)))
+    self.assertIn(-1, expected)
+
+  def test_weighted(self):
+    states = _random_states(50)
+    h = heuristics.Weighted([(2, heuristics.CubeCost()),
+                             (0.5, heuristics.NaiveCost())])
+    expected = [2 * s.cube_cost() + 0.5 * s.naive_cost() for s in states]
+    self.assertEqual(expected, [h(s) for s in states])
+    np.testing.assert_allclose(
+        expected, h.batch(heuristics.encode_batch(states)))
+
+  def test_get(self):
+    states = _random_states(20)
+    cube = heuristics.HEURISTICS['cube']
+    self.assertIs(cube, heuristics.get('cube'))
+    self.assertIs(cube, heuristics.get(cube))
+    h = heuristics.get('2*cube + 0.5*naive')
+    self.assertEqual([2 * s.cube_cost() + 0.5 * s.naive_cost() for s in states],
+                     [h(s) for s in states])
+    for spec in ('manhattan', 'x*cube', 'cube+', 'pdb:/nonexistent.npz'):
+      with self.assertRaises(ValueError):
+        heuristics.get(spec)
+
+  def test_register(self):
+    h = heuristics.Weighted([(3, heuristics.NaiveCost())])
+    heuristics.register('triple_naive', h)
+    self.addCleanup(heuristics.HEURISTICS.pop, 'triple_naive')
+    self.assertIs(h, heuristics.get('triple_naive'))
+    with self.assertRaises(ValueError):
+      heuristics.register('triple_naive', h)
+    with self.assertRaises(ValueError):
+      heuristics.register('a+b', h)
+
+  def test_pattern_database_by_name(self):
+    states = _random_states(50)
+    facelets = state.EDGE_FACELETS[3]
+    db = heuristics.PatternDatabase(facelets, {}, default=-1)
+    costs = {db.key(s.encode()): i for i, s in enumerate(states[:20])}
+    db = heuristics.PatternDatabase(facelets, costs, default=-1)
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'db.npz')
+      db.save(path)
+      loaded = heuristics.get('pdb:' + path)
+    self.assertEqual(db.facelets, loaded.facelets)
+    self.assertEqual([db(s) for s in states], [loaded(s) for s in states])
+
+
+if __name__ == '__main__':
+  unittest.main()
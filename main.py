@@ -2,11 +2,14 @@
 
 Cube must be arranged so that the white face is front and the top face is red.
 """
+import argparse
 import copy
 import time
 from typing import List
 import cProfile
 
+import canonical
+import heuristics
 import k_best
 import state
 
@@ -33,6 +36,9 @@ INITIAL_STATE = state.State(front='RWOWWWBWW', back='YYYYYYYYY', up='RRRRRRWRB',
                             down='ROOOOOOOO', left='BBGBBBBBW',
                             right='WGGGGGGGG')
 
+# Rejects move sequences which are known to be redundant.
+MOVE_AUTOMATON = canonical.build(max_length=5)
+
 recurse_calls = 0
 
 seen_states = set()
@@ -41,8 +47,11 @@ misses = 0
 
 
 def recurse(cur_state: state.State, init_state: state.State, depth: int,
-            path: List[int], best: k_best.KBest) -> None:
+            path: List[int], best: k_best.KBest,
+            heuristic: heuristics.Heuristic = heuristics.HEURISTICS['cube'],
+            automaton_state: int = canonical.START) -> None:
   global recurse_calls, seen_states, hits, misses
+  assert automaton_state != canonical.DEAD, path
   recurse_calls += 1
   # encoded_state = cur_state.encode()
   # if encoded_state in seen_states:
@@ -51,23 +60,22 @@ def recurse(cur_state: state.State, init_state: state.State, depth: int,
   #   misses += 1
   #   seen_states.add(encoded_state)
 
-  cost = cur_state.cube_cost()
+  cost = heuristic(cur_state)
   if cost < best.worst_cost and cur_state != init_state:
-    best.maybe_add(list(path), copy.deepcopy(cur_state),
-                   cur_state.cube_cost())
+    best.maybe_add(list(path), copy.deepcopy(cur_state), cost)
 
   if depth == 0:
     return
 
+  allowed = MOVE_AUTOMATON.allowed[automaton_state]
+  transitions = MOVE_AUTOMATON.transitions[automaton_state]
   for plane in range(6):
-    if (len(path) >= 3 and path[-1] == path[-2] and path[-1] == path[-3] and
-        path[-1] == plane):
-      continue  # Four consecutive identical ops is a no-op.
-    if len(path) >= 10 and plane not in path[-10:] and len(set(path[-10:])) == 5:
-      continue  ############ DANGEROUS HEURISTIC ############
+    if not (allowed >> plane) & 1:
+      continue  # Redundant sequence, e.g. D U F since U D F ends the same.
     path.append(plane)
     cur_state.rotate(plane)
-    recurse(cur_state, init_state, depth - 1, path, best)
+    recurse(cur_state, init_state, depth - 1, path, best, heuristic,
+            transitions[plane])
     del path[-1]
     cur_state.rotate(plane)
     cur_state.rotate(plane)
@@ -75,57 +83,84 @@ def recurse(cur_state: state.State, init_state: state.State, depth: int,
   if len(path) > 1 and path[-1] != path[-2]:
     # add two more of the last op
     plane = path[-1]
+    move = canonical.NUM_PLANES + plane
+    if not (allowed >> move) & 1:
+      return  # Redundant sequence.
     path.append(plane)
     path.append(plane)
     cur_state.rotate(plane)
     cur_state.rotate(plane)
-    recurse(cur_state, init_state, depth - 1, path, best)
+    recurse(cur_state, init_state, depth - 1, path, best, heuristic,
+            transitions[move])
     del path[-1]
     del path[-1]
     cur_state.rotate(plane)
     cur_state.rotate(plane)
 
 
-def main():
-  print(INITIAL_STATE)
-  print(f'Initial cost: Cube={INITIAL_STATE.cube_cost()}, '
-        f'Naive={INITIAL_STATE.naive_cost()}')
+def solve(initial_state: state.State, heuristic: heuristics.Heuristic,
+          max_depth_1: int = 9, max_depth_2: int = 8, beam_size: int = 20,
+          num_crawls: int = 5, verbose: bool = True) -> k_best.KBest:
+  """Beam search for low-cost paths from initial_state.
 
-  MAX_DEPTH_1 = 9
-  MAX_DEPTH_2 = 8
-  BEAM_SIZE = 20
+  Args:
+    initial_state: State to solve.
+    heuristic: Cost to minimize.
+    max_depth_1: Depth of the initial exhaustive crawl.
+    max_depth_2: Depth of the crawl from each beam item at every level.
+    beam_size: Number of items kept between levels.
+    num_crawls: Number of levels.
+    verbose: Whether to print progress.
 
+  Returns:
+    The best items found, sorted by cost.
+  """
   # Encoded states which have run through the crawler already.
   already_crawled = set()
 
-  best = k_best.KBest(BEAM_SIZE)
+  best = k_best.KBest(beam_size)
   start_time = time.time()
-  cur_state = copy.deepcopy(INITIAL_STATE)
-  recurse(cur_state, INITIAL_STATE, MAX_DEPTH_1, [], best)
-  print('Finished expansion crawl in %.2f sec. Best so far: %d' % (
-    time.time() - start_time, best.best_cost))
+  cur_state = copy.deepcopy(initial_state)
+  recurse(cur_state, initial_state, max_depth_1, [], best, heuristic)
+  if verbose:
+    print('Finished expansion crawl in %.2f sec. Best so far: %d' % (
+      time.time() - start_time, best.best_cost))
 
-  for ncrawl in range(5):
+  for ncrawl in range(num_crawls):
     new_bests = []
     for item in best.items:
-      new_bests.append(k_best.KBest(BEAM_SIZE))
+      new_bests.append(k_best.KBest(beam_size))
       new_bests[-1].maybe_add(list(item.path), copy.deepcopy(item.state),
                               item.cost)
       if item.encoded_state in already_crawled:
-        print('Skipped level %d crawl #%d: cost %d' % (
-          ncrawl, len(new_bests), item.cost))
+        if verbose:
+          print('Skipped level %d crawl #%d: cost %d' % (
+            ncrawl, len(new_bests), item.cost))
       else:
-        recurse(item.state, INITIAL_STATE, MAX_DEPTH_2, item.path,
-                new_bests[-1])
+        recurse(item.state, initial_state, max_depth_2, item.path,
+                new_bests[-1], heuristic, MOVE_AUTOMATON.resume(item.path))
         already_crawled.add(item.encoded_state)
-        print(
-          'Finished level %d crawl #%d, elapsed: %.2f sec, best here: %d' % (
-            ncrawl, len(new_bests), time.time() - start_time,
-            new_bests[-1].best_cost))
-    best = k_best.merge_kbests(new_bests, BEAM_SIZE)
-    print('End of level %d: Best costs %s' % (
-      ncrawl, [item.cost for item in best.items]))
+        if verbose:
+          print(
+            'Finished level %d crawl #%d, elapsed: %.2f sec, best here: %d' % (
+              ncrawl, len(new_bests), time.time() - start_time,
+              new_bests[-1].best_cost))
+    best = k_best.merge_kbests(new_bests, beam_size)
+    if verbose:
+      print('End of level %d: Best costs %s' % (
+        ncrawl, [item.cost for item in best.items]))
+  return best
+
+
+def main(heuristic_name: str = 'cube'):
+  heuristic = heuristics.get(heuristic_name)
+  print(INITIAL_STATE)
+  print(f'Initial cost: Cube={INITIAL_STATE.cube_cost()}, '
+        f'Naive={INITIAL_STATE.naive_cost()}, '
+        f'{heuristic_name}={heuristic(INITIAL_STATE)}')
 
+  start_time = time.time()
+  best = solve(INITIAL_STATE, heuristic)
   end_time = time.time() + 1e-3
 
   for item in best.items:
@@ -149,5 +184,14 @@ def main():
 
 
 if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--heuristic', default='cube',
+                      help="Cost to minimize, e.g. 'cube' or '2*cube+naive' "
+                           "(see heuristics.get).")
+  args = parser.parse_args()
+  try:
+    heuristics.get(args.heuristic)
+  except ValueError as e:
+    parser.error(str(e))
   # cProfile.run('main()')
-  main()
+  main(args.heuristic)
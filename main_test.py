@@ -0,0 +1,73 @@
+import copy
+import unittest
+
+import canonical
+import main
+import state
+
+
+class _AllStates:
+  """Stands in for k_best.KBest, recording every state offered to it."""
+
+  worst_cost = float('inf')
+
+  def __init__(self):
+    self.encoded = set()
+
+  def maybe_add(self, path, cube, cost):
+    del path, cost
+    self.encoded.add(cube.encode())
+
+
+def _unpruned_reachable(path, depth):
+  """States reached by recurse's moves after the path, without any pruning."""
+  perms = state.rotation_permutations()
+
+  def rotate(encoded, plane):
+    return tuple(encoded[i] for i in perms[plane])
+
+  encoded = state.State.solved().encode()
+  for plane in path:
+    encoded = rotate(encoded, plane)
+  # Nodes are (state, last plane, whether two more of it may be added).
+  level = {(encoded,) + canonical.path_context(path)}
+  seen = set(level)
+  for _ in range(depth):
+    next_level = set()
+    for encoded, last, available in level:
+      for plane in range(6):
+        next_level.add((rotate(encoded, plane), plane,
+                        last is not None and last != plane))
+      if available:
+        next_level.add((rotate(rotate(encoded, last), last), last, False))
+    level = next_level - seen
+    seen |= level
+  return {encoded for encoded, _, _ in seen}
+
+
+def _recurse_reachable(path, depth):
+  """States reached by main.recurse after the path, as when resuming a crawl."""
+  cube = state.State.solved()
+  for plane in path:
+    cube.rotate(plane)
+  best = _AllStates()
+  best.encoded.add(cube.encode())
+  main.recurse(cube, copy.deepcopy(cube), depth, list(path), best,
+               automaton_state=main.MOVE_AUTOMATON.resume(path))
+  return best.encoded
+
+
+class MainTest(unittest.TestCase):
+
+  def test_recurse_reaches_all_states(self):
+    self.assertSetEqual(_unpruned_reachable([], 6), _recurse_reachable([], 6))
+
+  def test_resumed_recurse_reaches_all_states(self):
+    u, f = state.ROTATIONS.index('U'), state.ROTATIONS.index('F')
+    for path in ([f], [u, u, u, u, f], [f, u], [f, u, u, u]):
+      self.assertSetEqual(_unpruned_reachable(path, 4),
+                          _recurse_reachable(path, 4), path)
+
+
+if __name__ == '__main__':
+  unittest.main()
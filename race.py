@@ -0,0 +1,136 @@
+"""Races the solver on problems equivalent to solving a given cube.
+
+Search effort varies a lot between equivalent problems (see symmetry.py), so
+solving all of them concurrently and keeping the first or shortest solution
+cuts the time spent on hard scrambles.
+"""
+import argparse
+import multiprocessing
+import time
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Union
+
+import heuristics
+import main
+import state
+import symmetry
+
+# A variant is (inverted, index into symmetry.SYMMETRIES).
+Variant = Tuple[bool, int]
+ALL_VARIANTS = tuple((inverted, i) for i in range(len(symmetry.SYMMETRIES))
+                     for inverted in (False, True))
+
+
+def variant_state(cube: state.State, variant: Variant) -> state.State:
+  inverted, index = variant
+  if inverted:
+    cube = symmetry.inverse(cube)
+  return symmetry.SYMMETRIES[index].apply(cube)
+
+
+def translate_path(path: Sequence[int], variant: Variant) -> List[int]:
+  """Translates a path solving variant_state(cube) into one solving cube."""
+  inverted, index = variant
+  path = symmetry.SYMMETRIES[index].translate_path(path)
+  if inverted:
+    path = symmetry.invert_path(path)
+  return path
+
+
+def _solve_variant(
+    args: Tuple[state.State, Variant, Union[str, heuristics.Heuristic],
+                Mapping[str, Any]]
+) -> Tuple[float, List[int], Variant, bool]:
+  """Solves a variant. Returns race's result, and whether it solves cube."""
+  cube, variant, heuristic_spec, solve_kwargs = args
+  heuristic = heuristics.get(heuristic_spec)
+  best = main.solve(variant_state(cube, variant), heuristic, verbose=False,
+                    **solve_kwargs)
+  path = translate_path(best.items[0].path, variant)
+  end_state = state.State.decode(cube.encode())
+  for plane in path:
+    end_state.rotate(plane)
+  return (heuristic(end_state), path, variant,
+          end_state == state.State.solved())
+
+
+def race(cube: state.State,
+         heuristic: Union[str, heuristics.Heuristic] = 'cube',
+         mode: str = 'first', processes: Optional[int] = None,
+         variants: Sequence[Variant] = ALL_VARIANTS,
+         timeout: Optional[float] = None,
+         **solve_kwargs) -> Tuple[float, List[int], Variant]:
+  """Solves variants of the cube concurrently.
+
+  Args:
+    cube: State to solve.
+    heuristic: Cost to minimize, as accepted by heuristics.get. A Heuristic
+      instance is pickled for the searches, so it need not be registered.
+    mode: 'first' returns the first solution found and stops the other
+      searches. 'shortest' waits for all searches and returns the solution
+      with the fewest turns (see symmetry.num_turns). A path is a solution if
+      it brings the cube to the solved state, whatever its cost. If no search
+      solves the cube, both return the lowest cost path. In particular,
+      'first' then waits for every search, which on a pool smaller than
+      len(variants) takes longer than a single search; use timeout to bound
+      it.
+    processes: Size of the process pool. Defaults to the number of CPUs.
+    variants: Problems to race.
+    timeout: If given, seconds after which the searches still running are
+      stopped, and the best result found so far is returned.
+    **solve_kwargs: Passed to main.solve.
+
+  Returns:
+    (cost, path, variant): The cost of the cube after the path, the path in the
+    frame of the original cube, and the variant which found it.
+
+  Raises:
+    TimeoutError: If no search finished within timeout.
+  """
+  if mode not in ('first', 'shortest'):
+    raise ValueError(f'Invalid mode {mode}')
+  deadline = None if timeout is None else time.monotonic() + timeout
+  heuristics.get(heuristic)  # Fail early on an invalid spec.
+  tasks = [(cube, variant, heuristic, solve_kwargs)
+           for variant in variants]
+  results = []
+  # Exiting the pool terminates searches which are still running.
+  with multiprocessing.Pool(processes) as pool:
+    pending = pool.imap_unordered(_solve_variant, tasks)
+    for _ in tasks:
+      remaining = (None if deadline is None else
+                   max(0., deadline - time.monotonic()))
+      try:
+        result = pending.next(remaining)
+      except multiprocessing.TimeoutError:
+        break
+      if mode == 'first' and result[3]:
+        return result[:3]
+      results.append(result)
+  if not results:
+    raise TimeoutError(f'No search finished within {timeout} sec')
+  best = min(results, key=lambda result: (
+      not result[3], result[0], symmetry.num_turns(result[1])))
+  return best[:3]
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--heuristic', default='cube',
+                      help="Cost to minimize, e.g. 'cube' or '2*cube+naive' "
+                           "(see heuristics.get).")
+  parser.add_argument('--mode', default='first', choices=('first', 'shortest'))
+  parser.add_argument('--processes', type=int, default=None)
+  parser.add_argument('--timeout', type=float, default=None,
+                      help='Seconds after which to return the best result.')
+  args = parser.parse_args()
+  try:
+    heuristics.get(args.heuristic)
+  except ValueError as e:
+    parser.error(str(e))
+  print(main.INITIAL_STATE)
+  cost, path, (inverted, index) = race(
+      main.INITIAL_STATE, args.heuristic, args.mode, args.processes,
+      timeout=args.timeout)
+  print('Cost %2d: Path=%s (symmetry %d%s)' % (
+    cost, ' '.join(state.ROTATIONS[i] for i in path), index,
+    ', inverted' if inverted else ''))
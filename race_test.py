@@ -0,0 +1,74 @@
+import unittest
+
+import heuristics
+import race
+import state
+import symmetry
+
+
+def _apply(cube, path):
+  cube = state.State.decode(cube.encode())
+  for plane in path:
+    cube.rotate(plane)
+  return cube
+
+
+class RaceTest(unittest.TestCase):
+
+  def setUp(self):
+    self.cube = _apply(state.State.solved(), [0, 3, 4, 4, 2])
+    self.solve_kwargs = dict(max_depth_1=4, max_depth_2=3, beam_size=5,
+                             num_crawls=1)
+
+  def test_translate_path(self):
+    scramble = [0, 3, 4, 4, 2]
+    for variant in race.ALL_VARIANTS:
+      inverted, index = variant
+      sym = symmetry.SYMMETRIES[index]
+      # Solve the variant directly, in the frame of the transformed cube.
+      solution = scramble if inverted else symmetry.invert_path(scramble)
+      variant_path = [sym.planes.index(plane) for plane in solution]
+      self.assertEqual(
+          state.State.solved(),
+          _apply(race.variant_state(self.cube, variant), variant_path))
+      self.assertEqual(
+          state.State.solved(),
+          _apply(self.cube, race.translate_path(variant_path, variant)))
+
+  def test_race(self):
+    for mode in ('first', 'shortest'):
+      cost, path, variant = race.race(self.cube, mode=mode, processes=2,
+                                      **self.solve_kwargs)
+      self.assertEqual(0, cost)
+      self.assertIn(variant, race.ALL_VARIANTS)
+      self.assertEqual(state.State.solved(), _apply(self.cube, path))
+
+  def test_race_unregistered_heuristic(self):
+    heuristic = heuristics.Weighted([(2, heuristics.CubeCost())])
+    cost, path, _ = race.race(self.cube, heuristic, processes=2,
+                              variants=race.ALL_VARIANTS[:4],
+                              **self.solve_kwargs)
+    self.assertEqual(0, cost)
+    self.assertEqual(state.State.solved(), _apply(self.cube, path))
+
+  def test_zero_cost_is_not_solved(self):
+    # Costs 0 everywhere, so only the end state tells whether it is solved.
+    heuristic = heuristics.PatternDatabase(state.EDGE_FACELETS[0], {})
+    variant = race.ALL_VARIANTS[0]
+    cost, path, _, solved = race._solve_variant(
+        (self.cube, variant, heuristic, self.solve_kwargs))
+    self.assertEqual(0, cost)
+    self.assertFalse(solved)
+    self.assertNotEqual(state.State.solved(), _apply(self.cube, path))
+
+  def test_timeout(self):
+    with self.assertRaises(TimeoutError):
+      race.race(self.cube, processes=2, timeout=0)
+
+  def test_invalid_mode(self):
+    with self.assertRaises(ValueError):
+      race.race(self.cube, mode='fastest')
+
+
+if __name__ == '__main__':
+  unittest.main()
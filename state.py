@@ -51,6 +51,59 @@ CORRECT_CORNER_VALS = (
 HALF_CORRECT_CORNER_VALS = tuple(
   _permutations(val) for val in CORRECT_CORNER_VALS)
 
+# Offset of each face within State.encode().
+FACE_OFFSETS = frozendict.frozendict(
+  {'front': 0, 'back': 9, 'up': 18, 'down': 27, 'left': 36, 'right': 45})
+
+
+def _facelets(*squares: Tuple[str, int]) -> Tuple[int, ...]:
+  return tuple(FACE_OFFSETS[face] + i for face, i in squares)
+
+
+# Indices within State.encode() of the squares of each corner, in the same
+# order as CORRECT_CORNER_VALS.
+CORNER_FACELETS = (
+  _facelets(('front', 0), ('up', 6), ('left', 2)),
+  _facelets(('front', 2), ('up', 8), ('right', 0)),
+  _facelets(('front', 6), ('down', 0), ('left', 8)),
+  _facelets(('front', 8), ('down', 2), ('right', 6)),
+  _facelets(('up', 0), ('left', 0), ('back', 2)),
+  _facelets(('up', 2), ('right', 2), ('back', 0)),
+  _facelets(('back', 6), ('right', 8), ('down', 8)),
+  _facelets(('back', 8), ('left', 6), ('down', 6)))
+# Indices within State.encode() of the squares of each edge, and the colors
+# they have when solved.
+EDGE_FACELETS = (
+  _facelets(('front', 1), ('up', 7)),
+  _facelets(('front', 3), ('left', 5)),
+  _facelets(('front', 5), ('right', 3)),
+  _facelets(('front', 7), ('down', 1)),
+  _facelets(('up', 3), ('left', 1)),
+  _facelets(('up', 5), ('right', 1)),
+  _facelets(('down', 3), ('left', 7)),
+  _facelets(('down', 5), ('right', 7)),
+  _facelets(('back', 1), ('up', 1)),
+  _facelets(('back', 5), ('left', 3)),
+  _facelets(('back', 3), ('right', 5)),
+  _facelets(('back', 7), ('down', 7)))
+CORRECT_EDGE_VALS = (
+  (0, 1), (0, 3), (0, 2), (0, 5), (1, 3), (1, 2), (5, 3), (5, 2), (4, 1),
+  (4, 3), (4, 2), (4, 5))
+
+# CORNER_SCORES[i][36 * a + 6 * b + c] is the score of corner i when its
+# squares have colors (a, b, c): 2 if correct, 1 if correct up to orientation,
+# 0 otherwise. EDGE_SCORES[i][6 * a + b] is defined similarly for edges, which
+# score 2 if correct and 0 otherwise.
+CORNER_SCORES = tuple(
+  tuple(2 if val == correct else 1 if val in half else 0
+        for val in itertools.product(range(6), repeat=3))
+  for correct, half in zip(CORRECT_CORNER_VALS, HALF_CORRECT_CORNER_VALS))
+EDGE_SCORES = tuple(
+  tuple(2 if val == correct else 0
+        for val in itertools.product(range(6), repeat=2))
+  for correct in CORRECT_EDGE_VALS)
+MAX_CUBE_COST = 2 * (len(CORNER_SCORES) + len(EDGE_SCORES))
+
 
 @dataclasses.dataclass
 class State:
@@ -160,41 +213,13 @@ class State:
     """Number of cubes in the wrong location.
     Cubes in the correct location with the wrong orientation have a half cost.
     """
-    n_correct = 0
-    n_half = 0
-    
-    # Corners
-    ful = (self.front[0], self.up[6], self.left[2])
-    fur = (self.front[2], self.up[8], self.right[0])
-    fdl = (self.front[6], self.down[0], self.left[8])
-    fdr = (self.front[8], self.down[2], self.right[6])
-    ulb = (self.up[0], self.left[0], self.back[2])
-    urb = (self.up[2], self.right[2], self.back[0])
-    brd = (self.back[6], self.right[8], self.down[8])
-    bld = (self.back[8], self.left[6], self.down[6])
-    actuals = (ful, fur, fdl, fdr, ulb, urb, brd, bld)
-    for actual, correct, half in zip(actuals, CORRECT_CORNER_VALS,
-                                     HALF_CORRECT_CORNER_VALS):
-      if actual == correct:
-        n_correct += 1
-      elif actual in half:
-        n_half += 1
-
-    # Edges
-    n_correct += (self.front[1] == 0 and self.up[7] == 1)
-    n_correct += (self.front[3] == 0 and self.left[5] == 3)
-    n_correct += (self.front[5] == 0 and self.right[3] == 2)
-    n_correct += (self.front[7] == 0 and self.down[1] == 5)
-    n_correct += (self.up[3] == 1 and self.left[1] == 3)
-    n_correct += (self.up[5] == 1 and self.right[1] == 2)
-    n_correct += (self.down[3] == 5 and self.left[7] == 3)
-    n_correct += (self.down[5] == 5 and self.right[7] == 2)
-    n_correct += (self.back[1] == 4 and self.up[1] == 1)
-    n_correct += (self.back[5] == 4 and self.left[3] == 3)
-    n_correct += (self.back[3] == 4 and self.right[5] == 2)
-    n_correct += (self.back[7] == 4 and self.down[7] == 5)
-    
-    return 40 - 2 * n_correct - n_half
+    e = self.front + self.back + self.up + self.down + self.left + self.right
+    score = 0
+    for (a, b, c), scores in zip(CORNER_FACELETS, CORNER_SCORES):
+      score += scores[36 * e[a] + 6 * e[b] + e[c]]
+    for (a, b), scores in zip(EDGE_FACELETS, EDGE_SCORES):
+      score += scores[6 * e[a] + e[b]]
+    return MAX_CUBE_COST - score
 
   def rotate(self, plane: int) -> None:
     """Rotates a given plane, clockwise when looking at the plane.
@@ -250,3 +275,29 @@ class State:
         self.left[l] = tmp
     else:
       raise ValueError(f'Invalid plane {plane}')
+
+
+def labeled_cube() -> State:
+  """A cube whose squares are labeled by their index in State.encode().
+
+  The labels are not valid colors, so the result must not be validated, but
+  rotate() only moves values around and can be used to track squares.
+  """
+  cube = State.solved()
+  for face_name, offset in FACE_OFFSETS.items():
+    setattr(cube, face_name, list(range(offset, offset + 9)))
+  return cube
+
+
+def rotation_permutations() -> List[Tuple[int, ...]]:
+  """Permutations of the encoded state applied by each plane rotation.
+
+  For each plane, returns p such that rotating a state with encoding e results
+  in the encoding (e[p[0]], e[p[1]], ...).
+  """
+  perms = []
+  for plane in range(len(ROTATIONS)):
+    labeled = labeled_cube()
+    labeled.rotate(plane)
+    perms.append(labeled.encode())
+  return perms
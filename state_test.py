@@ -99,6 +99,20 @@ class StateTest(unittest.TestCase):
         right='YRRBGYBYB')
     self.assertEqual(start, state.State.decode(start.encode()))
 
+  def test_rotation_permutations_match_rotate(self):
+    start = state.State(
+        front='OORYWRRGY',
+        back='WBRRYWWOW',
+        up='YOOGRYYWB',
+        down='WOOWOGBYR',
+        left='GWGRBBOBB',
+        right='YRGBGGBYG')
+    for plane, p in enumerate(state.rotation_permutations()):
+      rotated = copy.deepcopy(start)
+      rotated.rotate(plane)
+      encoded = start.encode()
+      self.assertEqual(rotated.encode(), tuple(encoded[i] for i in p))
+
   def test_permutations(self):
     lst = 'abc'
     perm = state._permutations(lst)
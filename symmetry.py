@@ -0,0 +1,167 @@
+"""Problems equivalent to solving a given cube.
+
+A cube can be solved by solving either:
+* The cube turned as a whole, with its colors relabeled so that the centers
+  have their usual colors (see state.COLORS_TO_INDICES). There are 24 such
+  symmetries, and a move in the turned cube corresponds to a move of another
+  plane in the original one.
+* The inverse cube, which is scrambled by the inverse of the moves which
+  scrambled the original cube. Its solution, inverted, solves the original.
+
+Permutations of squares are given as tuples p of indices into State.encode(),
+so that applying p to an encoding e results in (e[p[0]], e[p[1]], ...).
+"""
+import dataclasses
+import itertools
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+import state
+
+_NUM_SQUARES = 54
+_SOLVED = state.State.solved().encode()
+_CENTERS = tuple(offset + 4 for offset in state.FACE_OFFSETS.values())
+
+
+def _compose(p: Sequence[int], q: Sequence[int]) -> Tuple[int, ...]:
+  """The permutation applying p and then q."""
+  return tuple(p[i] for i in q)
+
+
+def _turn_y() -> Tuple[int, ...]:
+  """Turns the whole cube as the up plane is rotated."""
+  cube = state.labeled_cube()
+  cube.rotate(0)
+  for _ in range(3):
+    cube.rotate(1)
+  tmp = cube.front[3:6]
+  cube.front[3:6] = cube.right[3:6]
+  cube.right[3:6] = cube.back[3:6]
+  cube.back[3:6] = cube.left[3:6]
+  cube.left[3:6] = tmp
+  return cube.encode()
+
+
+def _turn_x() -> Tuple[int, ...]:
+  """Turns the whole cube as the right plane is rotated."""
+  cube = state.labeled_cube()
+  cube.rotate(3)
+  for _ in range(3):
+    cube.rotate(2)
+  for f, d, b, u in [(1, 1, 7, 1), (4, 4, 4, 4), (7, 7, 1, 7)]:
+    tmp = cube.front[f]
+    cube.front[f] = cube.down[d]
+    cube.down[d] = cube.back[b]
+    cube.back[b] = cube.up[u]
+    cube.up[u] = tmp
+  return cube.encode()
+
+
+@dataclasses.dataclass(frozen=True)
+class Symmetry:
+  """Turn of the whole cube, followed by relabeling of the colors.
+
+  Attributes:
+    squares: Permutation of the squares.
+    colors: colors[c] is the new label of color c.
+    planes: planes[p] is the plane of the original cube corresponding to
+      plane p of the transformed cube.
+  """
+  squares: Tuple[int, ...]
+  colors: Tuple[int, ...]
+  planes: Tuple[int, ...]
+
+  def apply(self, cube: state.State) -> state.State:
+    encoded = cube.encode()
+    return state.State.decode(
+        tuple(self.colors[encoded[i]] for i in self.squares))
+
+  def translate_path(self, path: Sequence[int]) -> List[int]:
+    """Translates a path solving apply(cube) into one solving cube."""
+    return [self.planes[plane] for plane in path]
+
+
+def _symmetry(squares: Tuple[int, ...],
+              plane_perms: Sequence[Tuple[int, ...]]) -> Symmetry:
+  colors = [0] * len(state.COLORS)
+  for center in _CENTERS:
+    colors[_SOLVED[squares[center]]] = _SOLVED[center]
+  planes = []
+  for transformed_perm in plane_perms:
+    # Find the plane p such that turning after rotating p is the same as
+    # rotating the transformed plane after turning.
+    target = _compose(squares, transformed_perm)
+    planes.append(next(p for p, perm in enumerate(plane_perms)
+                       if _compose(perm, squares) == target))
+  return Symmetry(squares=squares, colors=tuple(colors), planes=tuple(planes))
+
+
+def _all_symmetries() -> Tuple[Symmetry, ...]:
+  identity = tuple(range(_NUM_SQUARES))
+  generators = (_turn_x(), _turn_y())
+  turns = [identity]
+  seen = {identity}
+  for turn in turns:  # Grows while iterating.
+    for generator in generators:
+      composed = _compose(turn, generator)
+      if composed not in seen:
+        seen.add(composed)
+        turns.append(composed)
+  plane_perms = state.rotation_permutations()
+  return tuple(_symmetry(turn, plane_perms) for turn in turns)
+
+
+# All 24 symmetries, starting with the identity.
+SYMMETRIES = _all_symmetries()
+
+
+def _piece_squares() -> Dict[FrozenSet[int], Dict[int, int]]:
+  """Maps the colors of each square of a piece to the square's solved index."""
+  result = {}
+  for facelets_list in (state.CORNER_FACELETS, state.EDGE_FACELETS):
+    for facelets in facelets_list:
+      colors = frozenset(_SOLVED[f] for f in facelets)
+      result[colors] = {_SOLVED[f]: f for f in facelets}
+  return result
+
+
+_PIECE_SQUARES = _piece_squares()
+
+
+def square_permutation(cube: state.State) -> Tuple[int, ...]:
+  """The permutation which brings the solved cube to the given one."""
+  encoded = cube.encode()
+  perm = list(range(_NUM_SQUARES))
+  for facelets_list in (state.CORNER_FACELETS, state.EDGE_FACELETS):
+    for facelets in facelets_list:
+      squares = _PIECE_SQUARES[frozenset(encoded[f] for f in facelets)]
+      for f in facelets:
+        perm[f] = squares[encoded[f]]
+  return tuple(perm)
+
+
+def inverse(cube: state.State) -> state.State:
+  """The cube scrambled by the inverse of the moves which scrambled cube."""
+  perm = square_permutation(cube)
+  inverse_perm = [0] * _NUM_SQUARES
+  for i, p in enumerate(perm):
+    inverse_perm[p] = i
+  return state.State.decode(tuple(_SOLVED[i] for i in inverse_perm))
+
+
+def invert_path(path: Sequence[int]) -> List[int]:
+  """Translates a path solving inverse(cube) into one solving cube."""
+  # Rotating a plane three times undoes a single rotation.
+  return [plane for plane in reversed(path) for _ in range(3)]
+
+
+def num_turns(path: Sequence[int]) -> int:
+  """Number of quarter turns in a path, in either direction.
+
+  A run of three rotations of the same plane is a single counterclockwise
+  turn, so paths translated by invert_path are not penalized.
+  """
+  turns = 0
+  for _, run in itertools.groupby(path):
+    length = len(list(run)) % 4
+    turns += min(length, 4 - length)
+  return turns
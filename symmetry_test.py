@@ -0,0 +1,62 @@
+import random
+import unittest
+
+import state
+import symmetry
+
+
+def _scrambled(path):
+  cube = state.State.solved()
+  for plane in path:
+    cube.rotate(plane)
+  return cube
+
+
+class SymmetryTest(unittest.TestCase):
+
+  def test_symmetries(self):
+    self.assertEqual(24, len(symmetry.SYMMETRIES))
+    self.assertEqual(24, len({sym.squares for sym in symmetry.SYMMETRIES}))
+    self.assertEqual(tuple(range(6)), symmetry.SYMMETRIES[0].planes)
+    for sym in symmetry.SYMMETRIES:
+      self.assertEqual(state.State.solved(), sym.apply(state.State.solved()))
+      self.assertCountEqual(range(6), sym.planes)
+
+  def test_translate_path(self):
+    rng = random.Random(0)
+    for sym in symmetry.SYMMETRIES:
+      scramble = [rng.randrange(6) for _ in range(12)]
+      cube = _scrambled(scramble)
+      # Rotating the transformed cube corresponds to rotating the original.
+      transformed = sym.apply(cube)
+      for plane in range(6):
+        rotated = state.State.decode(cube.encode())
+        rotated.rotate(sym.planes[plane])
+        rotated_transformed = state.State.decode(transformed.encode())
+        rotated_transformed.rotate(plane)
+        self.assertEqual(sym.apply(rotated), rotated_transformed)
+
+  def test_inverse(self):
+    rng = random.Random(1)
+    scramble = [rng.randrange(6) for _ in range(20)]
+    cube = _scrambled(scramble)
+    self.assertEqual(_scrambled(symmetry.invert_path(scramble)),
+                     symmetry.inverse(cube))
+    self.assertEqual(cube, symmetry.inverse(symmetry.inverse(cube)))
+    # The scramble solves the inverse cube, so its inverse solves the cube.
+    for plane in symmetry.invert_path(scramble):
+      cube.rotate(plane)
+    self.assertEqual(state.State.solved(), cube)
+
+  def test_num_turns(self):
+    self.assertEqual(0, symmetry.num_turns([]))
+    self.assertEqual(3, symmetry.num_turns([0, 1, 2]))
+    self.assertEqual(2, symmetry.num_turns([0, 0, 0, 1, 1, 1]))
+    self.assertEqual(2, symmetry.num_turns([0, 0, 1, 1, 1, 1]))
+    scramble = [0, 3, 4, 4, 2]
+    self.assertEqual(symmetry.num_turns(scramble),
+                     symmetry.num_turns(symmetry.invert_path(scramble)))
+
+
+if __name__ == '__main__':
+  unittest.main()